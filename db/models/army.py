@@ -135,6 +135,7 @@ class RaceUnitSkin(Base):
     image_mime_type = Column(String(50), nullable=True)  # MIME тип изображения (image/png, image/jpeg)
     description = Column(Text, nullable=True)  # Описание скина
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Связь
     race_unit = relationship("RaceUnit", back_populates="skins")
@@ -167,7 +168,7 @@ class UserRace(Base):
     __tablename__ = 'user_races'
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey('game_users.id', ondelete='CASCADE'), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey('game_users.id', ondelete='CASCADE'), nullable=False)
     race_id = Column(Integer, ForeignKey('game_races.id', ondelete='CASCADE'), nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
@@ -178,6 +179,7 @@ class UserRace(Base):
 
     __table_args__ = (
         # Уникальность пользователь + раса
+        UniqueConstraint('user_id', 'race_id', name='unique_user_race'),
         {'extend_existing': True},
     )
 
@@ -4,7 +4,7 @@
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Numeric, Enum, CheckConstraint
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Numeric, Enum, CheckConstraint, Index, text
 from sqlalchemy.orm import relationship
 import enum
 
@@ -51,6 +51,19 @@ class Game(Base):
     completed_at = Column(DateTime, nullable=True)  # Когда игра завершилась
     last_move_at = Column(DateTime, nullable=True)  # Время последнего хода
 
+    # Список записей боёв листается по (completed_at, id) среди завершённых игр;
+    # активная игра пользователя ищется по (player1_id/player2_id, status);
+    # частичные индексы покрывают небольшие множества активных и ожидающих игр;
+    # список игр арены по статусу сортируется по created_at
+    __table_args__ = (
+        Index('idx_games_status_completed_at', 'status', completed_at.desc(), id.desc()),
+        Index('idx_games_player1_status', 'player1_id', 'status'),
+        Index('idx_games_player2_status', 'player2_id', 'status'),
+        Index('idx_games_in_progress', 'id', postgresql_where=text("status = 'in_progress'")),
+        Index('idx_games_waiting', 'id', postgresql_where=text("status = 'waiting'")),
+        Index('idx_games_status_created_at', 'status', created_at.desc()),
+    )
+
     # Связи
     player1 = relationship("GameUser", foreign_keys=[player1_id])
     player2 = relationship("GameUser", foreign_keys=[player2_id])
@@ -100,6 +113,7 @@ class BattleUnit(Base):
         CheckConstraint('position_y >= 0', name='positive_y'),
         CheckConstraint('total_count >= 0', name='positive_count'),
         CheckConstraint('remaining_hp >= 0', name='non_negative_hp'),
+        Index('idx_battle_units_alive', 'game_id', 'player_id', postgresql_where=text('total_count > 0')),
     )
 
     def __repr__(self):
@@ -138,6 +152,10 @@ class GameLog(Base):
     game_state = Column(Text, nullable=True)  # JSON снимок состояния игры (юниты, позиции, здоровье)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        Index('idx_game_logs_game_created_at', 'game_id', 'created_at'),
+    )
+
     # Связь
     game = relationship("Game", back_populates="logs")
 
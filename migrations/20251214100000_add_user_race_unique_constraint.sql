@@ -0,0 +1,77 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Прежняя проверка "есть ли раса у пользователя" перед вставкой могла при
+-- одновременных запросах создать дубликаты. Оставляем запись с MIN(id),
+-- а армии и юниты дубликатов переносим на неё
+CREATE TEMP TABLE user_race_duplicates AS
+SELECT ur.id AS duplicate_id, keep.keep_id
+FROM user_races ur
+JOIN (
+    SELECT user_id, race_id, MIN(id) AS keep_id
+    FROM user_races
+    GROUP BY user_id, race_id
+    HAVING COUNT(*) > 1
+) keep ON keep.user_id = ur.user_id AND keep.race_id = ur.race_id
+WHERE ur.id <> keep.keep_id;
+
+UPDATE armies a
+SET user_race_id = d.keep_id
+FROM user_race_duplicates d
+WHERE a.user_race_id = d.duplicate_id;
+
+-- Юниты дубликатов, которые уже есть у оставляемой расы (unique_user_race_unit)
+DELETE FROM user_race_units u
+USING user_race_duplicates d
+WHERE u.user_race_id = d.duplicate_id
+  AND EXISTS (
+      SELECT 1 FROM user_race_units k
+      WHERE k.user_race_id = d.keep_id AND k.race_unit_id = u.race_unit_id
+  );
+
+-- Одинаковые юниты в нескольких дубликатах одной расы: оставляем первый
+DELETE FROM user_race_units u
+USING user_race_duplicates d
+WHERE u.user_race_id = d.duplicate_id
+  AND EXISTS (
+      SELECT 1 FROM user_race_units o
+      JOIN user_race_duplicates od ON od.duplicate_id = o.user_race_id
+      WHERE od.keep_id = d.keep_id AND o.race_unit_id = u.race_unit_id AND o.id < u.id
+  );
+
+UPDATE user_race_units u
+SET user_race_id = d.keep_id
+FROM user_race_duplicates d
+WHERE u.user_race_id = d.duplicate_id;
+
+DELETE FROM user_races WHERE id IN (SELECT duplicate_id FROM user_race_duplicates);
+
+DROP TABLE user_race_duplicates;
+
+-- Уникальный constraint на (user_id, race_id): у пользователя не может быть
+-- двух одинаковых рас. Составной индекс обслуживает проверку существования
+-- расы при выборе и выборки рас пользователя
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'unique_user_race'
+    ) THEN
+        ALTER TABLE user_races ADD CONSTRAINT unique_user_race UNIQUE (user_id, race_id);
+    END IF;
+END $$;
+
+-- Одиночный индекс по user_id покрывается составным индексом
+DROP INDEX IF EXISTS idx_user_races_user_id;
+
+-- Индексы для user_race_units (user_race_id, race_unit_id) и
+-- race_unit_skins (race_unit_id) уже созданы миграцией 20251211072414
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+CREATE INDEX IF NOT EXISTS idx_user_races_user_id ON user_races(user_id);
+ALTER TABLE user_races DROP CONSTRAINT IF EXISTS unique_user_race;
+
+-- +goose StatementEnd
@@ -0,0 +1,17 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Список записей боёв выбирает завершённые игры по убыванию completed_at
+-- постранично (keyset по (completed_at, id)): индекс отдаёт страницу без
+-- сортировки всех завершённых игр
+CREATE INDEX IF NOT EXISTS idx_games_status_completed_at
+    ON games(status, completed_at DESC, id DESC);
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+DROP INDEX IF EXISTS idx_games_status_completed_at;
+
+-- +goose StatementEnd
@@ -0,0 +1,21 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Страница игры ищет активную игру текущего пользователя по
+-- (player1_id, status) OR (player2_id, status): с составными индексами
+-- каждая ветка условия становится точечным поиском по индексу
+CREATE INDEX IF NOT EXISTS idx_games_player1_status
+    ON games(player1_id, status);
+
+CREATE INDEX IF NOT EXISTS idx_games_player2_status
+    ON games(player2_id, status);
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+DROP INDEX IF EXISTS idx_games_player2_status;
+DROP INDEX IF EXISTS idx_games_player1_status;
+
+-- +goose StatementEnd
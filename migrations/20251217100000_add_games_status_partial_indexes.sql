@@ -0,0 +1,22 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Активные и ожидающие игры - малая доля таблицы games, а арена постоянно
+-- ищет их по статусу (index, play, EXISTS для кнопки). Частичные индексы
+-- содержат только такие строки и остаются маленькими по мере роста истории.
+-- Завершённые игры уже покрыты idx_games_status_completed_at.
+CREATE INDEX IF NOT EXISTS idx_games_in_progress
+    ON games(id) WHERE status = 'in_progress';
+
+CREATE INDEX IF NOT EXISTS idx_games_waiting
+    ON games(id) WHERE status = 'waiting';
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+DROP INDEX IF EXISTS idx_games_waiting;
+DROP INDEX IF EXISTS idx_games_in_progress;
+
+-- +goose StatementEnd
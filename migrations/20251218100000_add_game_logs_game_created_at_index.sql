@@ -0,0 +1,17 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Логи боя всегда читаются для одной игры в порядке created_at
+-- (состояние игры, данные для воспроизведения). Составной индекс отдаёт
+-- строки уже упорядоченными, без сортировки всех логов партии.
+CREATE INDEX IF NOT EXISTS idx_game_logs_game_created_at
+    ON game_logs(game_id, created_at);
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+DROP INDEX IF EXISTS idx_game_logs_game_created_at;
+
+-- +goose StatementEnd
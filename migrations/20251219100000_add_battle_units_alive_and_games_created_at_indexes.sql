@@ -0,0 +1,27 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Живые отряды игрока (или противника) ищутся в каждом запросе хода,
+-- проверке доступных действий и подсчёте окончания боя. Частичный индекс
+-- по (game_id, player_id) содержит только отряды с total_count > 0.
+CREATE INDEX IF NOT EXISTS idx_battle_units_alive
+    ON battle_units(game_id, player_id) WHERE total_count > 0;
+
+-- Список игр арены фильтруется по статусу и сортируется по created_at DESC
+-- с LIMIT: индекс отдаёт первые строки без сортировки всей выборки.
+CREATE INDEX IF NOT EXISTS idx_games_status_created_at
+    ON games(status, created_at DESC);
+
+-- Остальные горячие колонки уже проиндексированы: battle_units(game_id),
+-- user_units(game_user_id), obstacles(game_id), game_logs(game_id, created_at),
+-- уникальный game_users(username).
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+DROP INDEX IF EXISTS idx_games_status_created_at;
+DROP INDEX IF EXISTS idx_battle_units_alive;
+
+-- +goose StatementEnd
@@ -0,0 +1,19 @@
+-- +goose Up
+-- +goose StatementBegin
+
+-- Время последнего изменения скина: по нему строится ETag картинки скина
+ALTER TABLE race_unit_skins ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP;
+UPDATE race_unit_skins SET updated_at = created_at WHERE updated_at IS NULL;
+ALTER TABLE race_unit_skins ALTER COLUMN updated_at SET DEFAULT NOW();
+ALTER TABLE race_unit_skins ALTER COLUMN updated_at SET NOT NULL;
+
+COMMENT ON COLUMN race_unit_skins.updated_at IS 'Время последнего изменения скина';
+
+-- +goose StatementEnd
+
+-- +goose Down
+-- +goose StatementBegin
+
+ALTER TABLE race_unit_skins DROP COLUMN IF EXISTS updated_at;
+
+-- +goose StatementEnd
@@ -406,7 +406,7 @@ class TestTelegramNotifications:
         assert callable(notify_opponent)
         assert callable(send_telegram_notification)
 
-    @patch('web.arena.requests.post')
+    @patch('web.arena._telegram_session.post')
     def test_send_telegram_notification_structure(self, mock_post):
         """Тест: структура Telegram уведомления корректна"""
         mock_response = MagicMock()
@@ -416,7 +416,7 @@ class TestTelegramNotifications:
         from web.arena import send_telegram_notification
 
         # Мокаем получение токена
-        with patch('web.arena.get_telegram_bot_token', return_value='test_token'):
+        with patch('web.arena.TELEGRAM_BOT_TOKEN', 'test_token'):
             result = send_telegram_notification(
                 chat_id=12345,
                 message="Test message",
@@ -1100,7 +1100,7 @@ class TestPlayFormHiddenPlayerField:
 
         current_player, _ = self.db.get_available_opponents_by_username(f"{self.test_prefix}_user1")
 
-        # Поля, необходимые для шаблона PLAY_TEMPLATE
+        # Поля, необходимые для шаблона arena/play.html
         assert 'id' in current_player  # для hidden field
         assert 'name' in current_player  # для отображения имени
         assert 'balance' in current_player  # для отображения баланса
@@ -223,9 +223,9 @@ class TestGodotArenaIntegration:
     """Интеграционные тесты для Godot Arena"""
 
     def test_arena_link_in_web(self):
-        """Проверка ссылки на Godot арену в web/arena.py"""
-        arena_py_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'web', 'arena.py')
-        with open(arena_py_path, 'r') as f:
+        """Проверка ссылки на Godot арену в шаблоне арены"""
+        arena_template_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'web', 'templates', 'arena', 'index.html')
+        with open(arena_template_path, 'r') as f:
             content = f.read()
 
         assert '/godot-arena/' in content, "Должна быть ссылка на /godot-arena/"
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Тесты подбора противников по стоимости армии на базе SQLite в памяти
+"""
+
+import pytest
+from decimal import Decimal
+from sqlalchemy import event
+from db.models import GameUser, Unit, UserUnit
+from db.repository import Database
+
+
+@pytest.fixture
+def db():
+    """БД SQLite в памяти с созданными таблицами"""
+    database = Database('sqlite:///:memory:')
+    database.create_tables()
+    yield database
+    database.engine.dispose()
+
+
+def add_player(db, username, telegram_id, army):
+    """Создать игрока с армией: army - список пар (цена юнита, количество)"""
+    with db.get_session() as session:
+        player = GameUser(telegram_id=telegram_id, username=username, wins=3, losses=1)
+        session.add(player)
+        session.flush()
+        for i, (price, count) in enumerate(army):
+            unit = Unit(name=f'{username}_unit{i}', price=Decimal(price), damage=1, range=1, health=1)
+            session.add(unit)
+            session.flush()
+            session.add(UserUnit(game_user_id=player.id, unit_type_id=unit.id, count=count))
+        session.commit()
+
+
+class TestAvailableOpponents:
+    """Тесты get_available_opponents_by_username"""
+
+    def test_opponents_in_army_value_range(self, db):
+        """Противники подбираются по суммарной стоимости армии в пределах variance"""
+        add_player(db, 'alice', 1, [('10', 5), ('20', 5)])  # 150
+        add_player(db, 'bob', 2, [('70', 2)])  # 140
+        add_player(db, 'carol', 3, [('500', 1)])  # 500
+        add_player(db, 'dave', 4, [])  # без армии
+
+        current, opponents = db.get_available_opponents_by_username('alice', limit=10, variance=0.5)
+
+        assert current['army_value'] == 150.0
+        assert [(o['name'], o['army_value']) for o in opponents] == [('bob', 140.0)]
+        assert opponents[0]['win_rate'] == 75.0
+
+    def test_player_without_army_gets_any_armed_players(self, db):
+        """Игроку без армии предлагаются любые игроки с непустой армией"""
+        add_player(db, 'alice', 1, [])
+        add_player(db, 'bob', 2, [('70', 2)])
+        add_player(db, 'carol', 3, [('500', 1)])
+        add_player(db, 'dave', 4, [('10', 0)])
+
+        current, opponents = db.get_available_opponents_by_username('alice', limit=10)
+
+        assert current['army_value'] == 0.0
+        assert sorted(o['name'] for o in opponents) == ['bob', 'carol']
+
+    def test_limit(self, db):
+        """Количество противников ограничено limit"""
+        add_player(db, 'alice', 1, [('10', 1)])
+        for i in range(5):
+            add_player(db, f'player{i}', 10 + i, [('10', 1)])
+
+        _, opponents = db.get_available_opponents_by_username('alice', limit=3)
+
+        assert len(opponents) == 3
+
+    def test_query_count_independent_of_players(self, db):
+        """Число SQL-запросов не растёт с количеством игроков"""
+        add_player(db, 'alice', 1, [('10', 1)])
+        for i in range(5):
+            add_player(db, f'player{i}', 10 + i, [('10', 1), ('5', 2)])
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        _, opponents = db.get_available_opponents_by_username('alice', limit=10, variance=1)
+
+        assert len(opponents) == 5
+        assert len(statements) == 3
+
+    def test_unknown_user(self, db):
+        """Неизвестный пользователь: нет данных и противников"""
+        assert db.get_available_opponents_by_username('nobody') == (None, [])
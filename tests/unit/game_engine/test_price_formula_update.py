@@ -5,7 +5,7 @@
 
 import pytest
 from decimal import Decimal
-from web.app import calculate_unit_price
+from web.app import calculate_unit_price, form_decimal, DECIMAL_ZERO
 
 
 class TestPriceFormulaUpdate:
@@ -144,5 +144,19 @@ class TestPriceFormulaUpdate:
         assert price == expected_price, f"Ожидаемая цена {expected_price}, получено {price}"
 
 
+class TestFormDecimal:
+    """Тесты разбора вероятностных характеристик из формы юнита"""
+
+    @pytest.mark.parametrize('value', ['0', '0.0', '0.00', ' 0 '])
+    def test_zero_uses_constant(self, value):
+        """Нулевое значение не разбирается, а берётся готовая константа"""
+        assert form_decimal(value) is DECIMAL_ZERO
+
+    @pytest.mark.parametrize('value', ['0.1', '0.15', '0.9', '1', '.5'])
+    def test_matches_float_conversion(self, value):
+        """Результат совпадает с прежним Decimal(str(float(value)))"""
+        assert form_decimal(value) == Decimal(str(float(value)))
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Тесты шаблонов основных страниц веб-интерфейса
+"""
+
+import pytest
+from unittest.mock import patch
+from web.app import app
+
+
+APP_TEMPLATES = [
+    'units_catalog.html',
+    'images.html',
+    'units.html',
+    'unit_form.html',
+    'leaderboard.html',
+    'help.html',
+    'import.html',
+]
+
+
+@pytest.fixture
+def client():
+    """Создать тестовый клиент Flask с авторизованной сессией"""
+    app.config['TESTING'] = True
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['username'] = 'alice'
+        yield client
+
+
+class TestAppTemplates:
+    """Тесты загрузки шаблонов страниц по имени"""
+
+    @pytest.mark.parametrize('name', APP_TEMPLATES)
+    def test_template_loaded_once(self, name):
+        """Шаблон находится по имени и берётся из кеша при повторной загрузке"""
+        template = app.jinja_env.get_template(name)
+        assert app.jinja_env.get_template(name) is template
+
+    def test_help_page_rendered_from_cached_template(self, client):
+        """Страница справки рендерится из скомпилированного шаблона"""
+        template = app.jinja_env.get_template('help.html')
+
+        with patch('web.app.db.get_session', side_effect=RuntimeError('no database')), \
+                patch.object(app.jinja_env, 'from_string') as from_string:
+            response = client.get('/help')
+
+        assert response.status_code == 200
+        assert 'class="navbar"' in response.data.decode('utf-8')
+        from_string.assert_not_called()
+        assert app.jinja_env.get_template('help.html') is template
@@ -0,0 +1,987 @@
+#!/usr/bin/env python3
+"""
+Тесты страниц арены на базе SQLite в памяти
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from sqlalchemy import event
+from db.models import Game, GameStatus, GameUser, Field, Unit, UserUnit, BattleUnit
+from db.repository import Database
+from web.app import app
+
+
+@pytest.fixture
+def arena_db():
+    """Подменить БД модуля арены на SQLite в памяти"""
+    from web.arena import invalidate_arena_stats
+
+    db = Database('sqlite:///:memory:')
+    db.create_tables()
+    invalidate_arena_stats()
+    with patch('web.arena.db', db), patch.dict('web.arena._completed_replays', clear=True), \
+            patch.dict('web.arena._opponents_cache', clear=True), patch.dict('web.arena._game_states', clear=True), \
+            patch.dict('web.arena._reference_cache', clear=True), patch.dict('web.arena._obstacles_cache', clear=True):
+        yield db
+    invalidate_arena_stats()
+    db.engine.dispose()
+
+
+@pytest.fixture
+def client():
+    """Создать тестовый клиент Flask с авторизованной сессией"""
+    app.config['TESTING'] = True
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['username'] = 'Alice'
+        yield client
+
+
+def add_games(db, statuses):
+    """Создать двух игроков, поле и игры с указанными статусами; вернуть id игр"""
+    with db.get_session() as session_db:
+        alice = GameUser(telegram_id=1, username='Alice')
+        bob = GameUser(telegram_id=2, username='Bob')
+        field = Field(width=5, height=5, name='5x5')
+        session_db.add_all([alice, bob, field])
+        session_db.flush()
+
+        now = datetime.utcnow()
+        games = []
+        for i, status in enumerate(statuses):
+            game = Game(
+                player1_id=alice.id,
+                player2_id=bob.id,
+                field_id=field.id,
+                status=status,
+                winner_id=alice.id if status == GameStatus.COMPLETED else None,
+                completed_at=now - timedelta(minutes=i) if status == GameStatus.COMPLETED else None
+            )
+            session_db.add(game)
+            games.append(game)
+        session_db.commit()
+        return [game.id for game in games]
+
+
+def add_battle_units(db, game_id, count):
+    """Расставить на поле игры count отрядов игроков поочерёдно"""
+    with db.get_session() as session_db:
+        game = session_db.get(Game, game_id)
+        unit = Unit(name=f'unit_for_game_{game_id}', icon='🗡', price=Decimal('10'), damage=2, range=1, health=5)
+        session_db.add(unit)
+        session_db.flush()
+        for i in range(count):
+            player_id = game.player1_id if i % 2 == 0 else game.player2_id
+            user_unit = UserUnit(game_user_id=player_id, unit_type_id=unit.id, count=3)
+            session_db.add(user_unit)
+            session_db.flush()
+            session_db.add(BattleUnit(
+                game_id=game_id, user_unit_id=user_unit.id, player_id=player_id,
+                position_x=i, position_y=0 if i % 2 == 0 else 4, total_count=3, remaining_hp=5
+            ))
+        session_db.commit()
+
+
+def record_statements(db):
+    """Записывать SQL-запросы к БД в возвращаемый список"""
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestArenaIndex:
+    """Тесты главной страницы арены"""
+
+    def test_game_counters(self, arena_db, client):
+        """Счётчики игр по статусам считаются одним запросом"""
+        add_games(arena_db, [GameStatus.COMPLETED, GameStatus.COMPLETED, GameStatus.IN_PROGRESS, GameStatus.WAITING])
+
+        with patch('web.arena.render_template', return_value='') as render:
+            client.get('/arena/')
+
+        context = render.call_args.kwargs
+        assert context['total_games'] == 4
+        assert context['completed_games'] == 2
+        assert context['active_games'] == 1
+        assert context['total_players'] == 2
+        assert context['current_player_id'] is not None
+
+    def test_active_game_flag_not_cached(self, arena_db, client):
+        """Флаг активной игры проверяется через EXISTS мимо кеша счётчиков"""
+        game_id = add_games(arena_db, [GameStatus.WAITING])[0]
+
+        with patch('web.arena.render_template', return_value='') as render:
+            client.get('/arena/')
+            assert render.call_args.kwargs['has_active_game'] is False
+
+            with arena_db.get_session() as session_db:
+                session_db.get(Game, game_id).status = GameStatus.IN_PROGRESS
+                session_db.commit()
+            client.get('/arena/')
+
+        assert render.call_args.kwargs['has_active_game'] is True
+        assert render.call_args.kwargs['active_games'] == 0
+
+    def test_index_template_cached(self, arena_db, client):
+        """Шаблон арены загружается из файла и компилируется один раз"""
+        response = client.get('/arena/')
+        assert 'Арена' in response.data.decode('utf-8')
+        template = app.jinja_env.get_template('arena/index.html')
+        client.get('/arena/')
+        assert app.jinja_env.get_template('arena/index.html') is template
+
+    def test_stats_cached_until_post(self, arena_db, client):
+        """Статистика берётся из кеша, пока успешный POST арены её не сбросит"""
+        from flask import Response
+        from web.arena import reset_stats_after_change
+
+        add_games(arena_db, [GameStatus.COMPLETED])
+
+        with patch('web.arena.render_template', return_value='') as render:
+            client.get('/arena/')
+            with arena_db.get_session() as session_db:
+                session_db.query(Game).delete()
+                session_db.commit()
+
+            # Неуспешный POST (игра не найдена) кеш не трогает
+            client.post('/arena/api/games/999/cancel')
+            client.get('/arena/')
+            assert render.call_args.kwargs['total_games'] == 1
+
+            with app.test_request_context('/arena/api/games/create', method='POST'):
+                reset_stats_after_change(Response(status=200))
+            client.get('/arena/')
+            assert render.call_args.kwargs['total_games'] == 0
+
+
+class TestStatsStream:
+    """Тесты потока статистики арены (Server-Sent Events)"""
+
+    def test_events_sent_on_change(self, arena_db):
+        """Первое событие - текущая статистика, дальше пинги до изменения игр"""
+        import json
+        from web.arena import arena_stats_events, invalidate_arena_stats
+
+        add_games(arena_db, [GameStatus.IN_PROGRESS])
+
+        with patch('web.arena.ARENA_STREAM_HEARTBEAT', 0.01):
+            events = arena_stats_events()
+            first = next(events)
+            assert first.startswith('data: ')
+            assert json.loads(first[len('data: '):])['active_games'] == 1
+
+            assert next(events) == ': ping\n\n'
+
+            with arena_db.get_session() as session_db:
+                session_db.query(Game).update({Game.status: GameStatus.COMPLETED})
+                session_db.commit()
+            invalidate_arena_stats()
+
+            changed = json.loads(next(events)[len('data: '):])
+            events.close()
+
+        assert changed['active_games'] == 0
+        assert changed['completed_games'] == 1
+
+    def test_subscribers_read_stats_recomputed_once(self, arena_db):
+        """После изменения статистика пересчитывается один раз, подписчики читают её из кеша"""
+        import json
+        from web.arena import arena_stats_events, invalidate_arena_stats
+
+        add_games(arena_db, [GameStatus.IN_PROGRESS])
+
+        with patch('web.arena.ARENA_STREAM_HEARTBEAT', 0.01):
+            subscribers = [arena_stats_events() for _ in range(3)]
+            for events in subscribers:
+                next(events)
+
+            with arena_db.get_session() as session_db:
+                session_db.query(Game).update({Game.status: GameStatus.COMPLETED})
+                session_db.commit()
+            statements = record_statements(arena_db)
+            invalidate_arena_stats()
+
+            changed = [json.loads(next(events)[len('data: '):]) for events in subscribers]
+            for events in subscribers:
+                events.close()
+
+        assert all(stats['completed_games'] == 1 for stats in changed)
+        assert len(statements) == 2
+
+    def test_invalidate_without_subscribers_skips_queries(self, arena_db):
+        """Без подписчиков потока сброс кеша не выполняет запросов"""
+        from web.arena import invalidate_arena_stats
+
+        statements = record_statements(arena_db)
+        invalidate_arena_stats()
+
+        assert statements == []
+
+    def test_stream_closes_after_max_duration(self, arena_db):
+        """Поток завершается по истечении максимальной длительности"""
+        from web.arena import arena_stats_events
+
+        with patch('web.arena.ARENA_STREAM_MAX_DURATION', 0):
+            assert len(list(arena_stats_events())) == 1
+
+    def test_stream_endpoint(self, arena_db, client):
+        """Эндпоинт отдаёт text/event-stream без кеширования"""
+        response = client.get('/arena/stream', buffered=False)
+
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['Cache-Control'] == 'no-cache'
+        assert next(response.response).startswith(b'data: ')
+        response.close()
+
+
+class TestApiGameState:
+    """Тесты API состояния игры"""
+
+    def test_unit_types_loaded_with_battle_units(self, arena_db, client):
+        """Число запросов не зависит от количества отрядов на поле"""
+        from web.arena import _game_states
+
+        small_game, big_game = add_games(arena_db, [GameStatus.IN_PROGRESS, GameStatus.IN_PROGRESS])
+        add_battle_units(arena_db, small_game, 1)
+        add_battle_units(arena_db, big_game, 4)
+
+        # Первые запросы загружают справочники и препятствия, дальше они берутся из кеша
+        client.get(f'/arena/api/games/{small_game}/state')
+        client.get(f'/arena/api/games/{big_game}/state')
+        _game_states.clear()
+
+        statements = record_statements(arena_db)
+        client.get(f'/arena/api/games/{small_game}/state')
+        small_count = len(statements)
+        del statements[:]
+        state = client.get(f'/arena/api/games/{big_game}/state').get_json()
+
+        assert len(statements) == small_count
+        assert len(state['units']) == 4
+        assert state['units'][0]['unit_type']['name'] == f'unit_for_game_{big_game}'
+        assert state['player2_name'] == 'Bob'
+
+    def test_unchanged_state_served_from_cache(self, arena_db, client):
+        """Пока строка игры не менялась, опрос выполняет один запрос и поддерживает ETag"""
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        add_battle_units(arena_db, game_id, 2)
+
+        first = client.get(f'/arena/api/games/{game_id}/state')
+        statements = record_statements(arena_db)
+        second = client.get(f'/arena/api/games/{game_id}/state')
+
+        assert len(statements) == 1
+        assert second.data == first.data
+        assert second.headers['Cache-Control'] == 'no-cache'
+        not_modified = client.get(f'/arena/api/games/{game_id}/state', headers={'If-None-Match': first.headers['ETag']})
+        assert not_modified.status_code == 304
+
+    def test_state_rebuilt_after_move(self, arena_db, client):
+        """Ход (в том числе из бота) меняет last_move_at, и состояние собирается заново"""
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        add_battle_units(arena_db, game_id, 2)
+        client.get(f'/arena/api/games/{game_id}/state')
+
+        with arena_db.get_session() as session_db:
+            session_db.query(BattleUnit).filter_by(game_id=game_id, position_x=0).update({BattleUnit.position_y: 2})
+            session_db.get(Game, game_id).last_move_at = datetime.utcnow()
+            session_db.commit()
+
+        state = client.get(f'/arena/api/games/{game_id}/state').get_json()
+        assert {(u['x'], u['y']) for u in state['units']} == {(0, 2), (1, 4)}
+
+    def test_state_encoded_compactly(self, arena_db, client):
+        """Состояние кодируется без пробелов и без экранирования кириллицы"""
+        from db.models import GameLog
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        with arena_db.get_session() as session_db:
+            session_db.add(GameLog(game_id=game_id, event_type='move', message='Отряд сделал ход'))
+            session_db.commit()
+
+        response = client.get(f'/arena/api/games/{game_id}/state')
+
+        assert 'Отряд сделал ход' in response.data.decode('utf-8')
+        assert b'\\u' not in response.data
+        assert b'": ' not in response.data
+        assert response.headers['Content-Length'] == str(len(response.data))
+        assert response.get_json()['logs'][0]['event_type'] == 'move'
+
+    def test_logs_read_as_columns_in_order(self, arena_db, client):
+        """Логи читаются только нужными колонками и упорядочены по времени"""
+        from db.models import GameLog
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        now = datetime.utcnow()
+        with arena_db.get_session() as session_db:
+            session_db.add_all([
+                GameLog(game_id=game_id, event_type='attack', message='second', created_at=now),
+                GameLog(game_id=game_id, event_type='move', message='first', created_at=now - timedelta(seconds=5)),
+            ])
+            session_db.commit()
+
+        statements = record_statements(arena_db)
+        state = client.get(f'/arena/api/games/{game_id}/state').get_json()
+
+        assert [log['message'] for log in state['logs']] == ['first', 'second']
+        assert state['logs'][0]['created_at'] == (now - timedelta(seconds=5)).isoformat()
+        logs_sql = [sql for sql in statements if 'FROM game_logs' in sql]
+        assert len(logs_sql) == 1 and 'game_logs.id' not in logs_sql[0]
+
+    def test_missing_game(self, arena_db, client):
+        """Несуществующая игра: 404"""
+        assert client.get('/arena/api/games/999/state').status_code == 404
+
+
+class TestUnitActions:
+    """Тесты API доступных действий юнита"""
+
+    def test_attack_targets_within_range(self, arena_db, client):
+        """Цели атаки - враги в пределах дальности; дальние отсекаются уже в SQL"""
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        add_battle_units(arena_db, game_id, 4)
+        with arena_db.get_session() as session_db:
+            session_db.query(Unit).update({Unit.range: 5})
+            attacker_id = session_db.query(BattleUnit.id).filter_by(game_id=game_id, position_x=0).scalar()
+            near_id = session_db.query(BattleUnit.id).filter_by(game_id=game_id, position_x=1).scalar()
+            session_db.commit()
+
+        statements = record_statements(arena_db)
+        actions = client.get(f'/arena/api/games/{game_id}/units/{attacker_id}/actions').get_json()
+
+        assert actions['can_attack'] == [{'id': near_id, 'x': 1, 'y': 4}]
+        assert any('BETWEEN' in sql for sql in statements)
+
+
+class TestMakeMove:
+    """Тесты проверок API хода"""
+
+    def prepare_game(self, db):
+        """Активная игра с двумя отрядами, ход у Alice; вернуть id игры и отряда Alice"""
+        game_id = add_games(db, [GameStatus.IN_PROGRESS])[0]
+        add_battle_units(db, game_id, 2)
+        with db.get_session() as session_db:
+            game = session_db.get(Game, game_id)
+            game.current_player_id = game.player1_id
+            unit_id = session_db.query(BattleUnit.id).filter_by(game_id=game_id, player_id=game.player1_id).scalar()
+            session_db.commit()
+        return game_id, unit_id
+
+    def test_validation_in_two_queries(self, arena_db, client):
+        """Пользователь, игра и юнит проверяются двумя запросами"""
+        game_id, unit_id = self.prepare_game(arena_db)
+
+        statements = record_statements(arena_db)
+        response = client.post(f'/arena/api/games/{game_id}/move', json={'unit_id': unit_id, 'action': 'dance'})
+
+        assert response.status_code == 400
+        assert len(statements) == 2
+
+    def test_missing_game_and_unit(self, arena_db, client):
+        """Отсутствующие игра и юнит различаются"""
+        game_id, unit_id = self.prepare_game(arena_db)
+
+        missing_game = client.post('/arena/api/games/999/move', json={'unit_id': unit_id, 'action': 'skip'})
+        missing_unit = client.post(f'/arena/api/games/{game_id}/move', json={'unit_id': 999, 'action': 'skip'})
+
+        assert missing_game.status_code == 404
+        assert missing_game.get_json()['message'] == 'Game not found'
+        assert missing_unit.status_code == 404
+        assert missing_unit.get_json()['message'] == 'Unit not found'
+
+    def test_response_reflects_updated_game(self, arena_db, client):
+        """Ответ на ход содержит состояние игры после действия движка"""
+        game_id, unit_id = self.prepare_game(arena_db)
+
+        with patch('web.arena._telegram_pool') as pool:
+            statements = record_statements(arena_db)
+            result = client.post(f'/arena/api/games/{game_id}/move', json={'unit_id': unit_id, 'action': 'skip'}).get_json()
+
+        with arena_db.get_session() as session_db:
+            game = session_db.get(Game, game_id)
+            assert result['success'] is True
+            assert result['turn_switched'] is True
+            assert result['current_player_id'] == game.current_player_id == game.player2_id
+            assert result['game_status'] == 'in_progress'
+        # После хода строка игры перечитывается только нужными колонками
+        assert any('FROM games' in sql and 'games.field_id' not in sql for sql in statements)
+
+    def test_notifications_sent_in_background(self, arena_db, client):
+        """Уведомления о ходе ставятся в фоновый пул и не выполняются в запросе"""
+        from web.arena import notify_move
+
+        game_id, unit_id = self.prepare_game(arena_db)
+
+        with patch('web.arena._telegram_pool') as pool, patch('web.arena.notify_opponent') as notify:
+            client.post(f'/arena/api/games/{game_id}/move', json={'unit_id': unit_id, 'action': 'skip'})
+
+        with arena_db.get_session() as session_db:
+            alice_id = session_db.get(Game, game_id).player1_id
+        notify.assert_not_called()
+        args = pool.submit.call_args[0]
+        assert args[:3] == (notify_move, game_id, alice_id)
+        assert args[4:] == ('skip', GameStatus.IN_PROGRESS, None, True)
+
+    def test_foreign_unit(self, arena_db, client):
+        """Чужой юнит двигать нельзя"""
+        game_id, _ = self.prepare_game(arena_db)
+        with arena_db.get_session() as session_db:
+            game = session_db.get(Game, game_id)
+            bob_unit_id = session_db.query(BattleUnit.id).filter_by(game_id=game_id, player_id=game.player2_id).scalar()
+
+        response = client.post(f'/arena/api/games/{game_id}/move', json={'unit_id': bob_unit_id, 'action': 'skip'})
+
+        assert response.status_code == 403
+        assert response.get_json()['message'] == 'This unit does not belong to you'
+
+
+class TestReferenceCache:
+    """Тесты кеша справочников (типы юнитов, поля)"""
+
+    def test_replay_uses_cached_unit_types(self, arena_db):
+        """Повторная сборка данных боя не запрашивает типы юнитов и поля"""
+        from web.arena import get_game_full_data
+
+        game_id = add_games(arena_db, [GameStatus.COMPLETED])[0]
+        add_battle_units(arena_db, game_id, 3)
+
+        first = get_game_full_data(game_id)
+        statements = record_statements(arena_db)
+        second = get_game_full_data(game_id)
+
+        assert second == first
+        assert second['units'][0]['unit_type']['name'] == f'unit_for_game_{game_id}'
+        assert 'price' not in second['units'][0]['unit_type']
+        assert second['field'] == {'width': 5, 'height': 5, 'name': '5x5'}
+        assert not any('FROM units' in sql or 'FROM fields' in sql for sql in statements)
+
+    def test_admin_unit_edit_resets_cache(self, arena_db):
+        """POST правки юнита в админке сбрасывает кеш типов юнитов"""
+        from flask import Response
+        from web.app import reset_unit_types_after_edit
+        from web.arena import get_unit_types, _reference_cache
+
+        with arena_db.get_session() as session_db:
+            get_unit_types(session_db)
+        with app.test_request_context('/admin/units/edit/1', method='POST') as ctx:
+            ctx.request.url_rule, ctx.request.view_args = app.url_map.bind('localhost').match(
+                '/admin/units/edit/1', method='POST', return_rule=True
+            )
+            reset_unit_types_after_edit(Response(status=302))
+
+        assert 'unit_types' not in _reference_cache
+        assert 'unit_type_payloads' not in _reference_cache
+
+    def test_unit_type_payload_shared_between_units(self, arena_db):
+        """Отряды одного типа ссылаются на один словарь данных типа"""
+        from web.arena import build_game_state
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        add_battle_units(arena_db, game_id, 3)
+
+        with arena_db.get_session() as session_db:
+            state = build_game_state(session_db, session_db.get(Game, game_id))
+
+        first, second, third = (unit['unit_type'] for unit in state['units'])
+        assert first is second is third
+        assert first['name'] == f'unit_for_game_{game_id}'
+        assert 'price' not in first
+
+    def test_obstacles_loaded_once_per_game(self, arena_db):
+        """Препятствия игры запрашиваются из БД только при первой сборке данных боя"""
+        from db.models import Obstacle
+        from web.arena import get_game_full_data
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        with arena_db.get_session() as session_db:
+            session_db.add_all([Obstacle(game_id=game_id, position_x=2, position_y=2),
+                                Obstacle(game_id=game_id, position_x=3, position_y=1)])
+            session_db.commit()
+
+        first = get_game_full_data(game_id)
+        statements = record_statements(arena_db)
+        second = get_game_full_data(game_id)
+
+        assert sorted((o['x'], o['y']) for o in second['obstacles']) == [(2, 2), (3, 1)]
+        assert second['obstacles'] == first['obstacles']
+        assert not any('FROM obstacles' in sql for sql in statements)
+
+
+class TestApiPlayers:
+    """Тесты API списков игроков и игр"""
+
+    def test_players_with_units_in_two_queries(self, arena_db, client):
+        """Игроки, их юниты и типы юнитов загружаются двумя запросами"""
+        add_games(arena_db, [])
+        with arena_db.get_session() as session_db:
+            units = [Unit(name=f'unit{i}', icon='🗡', price=Decimal('10'), damage=1, range=1, health=1) for i in range(3)]
+            session_db.add_all(units)
+            session_db.flush()
+            for user_id in session_db.query(GameUser.id).all():
+                for i, unit in enumerate(units):
+                    session_db.add(UserUnit(game_user_id=user_id[0], unit_type_id=unit.id, count=i))
+            session_db.commit()
+
+        statements = record_statements(arena_db)
+        players = client.get('/arena/api/players').get_json()
+
+        assert len(statements) == 2
+        assert [p['name'] for p in players] == ['Alice', 'Bob']
+        assert sorted(u['name'] for u in players[0]['units']) == ['unit1', 'unit2']
+
+    def test_games_with_players_in_three_queries(self, arena_db, client):
+        """Игры, их игроки и поля загружаются тремя запросами независимо от числа игр"""
+
+        add_games(arena_db, [GameStatus.COMPLETED] * 4)
+
+        statements = record_statements(arena_db)
+        games = client.get('/arena/api/games?status=completed').get_json()
+
+        assert len(statements) == 3
+        assert len(games) == 4
+        assert {(g['player1']['name'], g['player2']['name'], g['field_size']) for g in games} == {('Alice', 'Bob', '5x5')}
+
+    def test_games_read_only_listed_columns(self, arena_db, client):
+        """Игры и игроки читаются нужными колонками, поля берутся из справочника"""
+        add_games(arena_db, [GameStatus.COMPLETED] * 2)
+        client.get('/arena/api/games?status=completed')
+
+        statements = record_statements(arena_db)
+        games = client.get('/arena/api/games?status=completed').get_json()
+
+        assert len(statements) == 2
+        assert 'games.last_move_at' not in statements[0]
+        assert 'game_users.telegram_id' not in statements[1]
+        assert games[0]['field_size'] == '5x5'
+        assert games[0]['player2']['name'] == 'Bob'
+
+    def test_no_games(self, arena_db, client):
+        """Пустой список игр не выполняет запросов IN"""
+        assert client.get('/arena/api/games?status=active').get_json() == []
+
+
+class TestReplayList:
+    """Тесты списка записей боёв"""
+
+    def test_completed_games_listed_with_names(self, arena_db, client):
+        """Завершённые игры выводятся с именами игроков, победителем и полем"""
+        game_ids = add_games(arena_db, [GameStatus.COMPLETED, GameStatus.IN_PROGRESS])
+
+        html = client.get('/arena/replay').get_data(as_text=True)
+
+        assert f'<td>#{game_ids[0]}</td>' in html
+        assert f'<td>#{game_ids[1]}</td>' not in html
+        assert '<td>Alice</td>' in html
+        assert '<td>Bob</td>' in html
+        assert '🏆 Alice' in html
+        assert '<td>5x5</td>' in html
+
+
+    def test_keyset_pagination(self, arena_db, client):
+        """Следующая страница начинается после последней игры предыдущей"""
+        import re
+
+        game_ids = add_games(arena_db, [GameStatus.COMPLETED] * 3)
+
+        with patch('web.arena.REPLAY_PAGE_SIZE', 2):
+            first = client.get('/arena/replay').get_data(as_text=True)
+            next_url = re.search(r'href="([^"]*before_id=[^"]*)"', first).group(1).replace('&amp;', '&')
+            second = client.get(next_url).get_data(as_text=True)
+
+        # Игры идут от последней завершённой к более ранним
+        assert f'<td>#{game_ids[0]}</td>' in first
+        assert f'<td>#{game_ids[1]}</td>' in first
+        assert f'<td>#{game_ids[2]}</td>' not in first
+        assert f'<td>#{game_ids[2]}</td>' in second
+        assert f'<td>#{game_ids[0]}</td>' not in second
+        assert 'before_id=' not in second
+
+    def test_invalid_cursor_shows_first_page(self, arena_db, client):
+        """Некорректный курсор открывает первую страницу"""
+        game_id = add_games(arena_db, [GameStatus.COMPLETED])[0]
+
+        html = client.get('/arena/replay?before=not-a-date&before_id=1').get_data(as_text=True)
+
+        assert f'<td>#{game_id}</td>' in html
+
+
+class TestReplayView:
+    """Тесты просмотра записи боя"""
+
+    def test_page_loads_data_separately(self, arena_db, client):
+        """Страница боя не встраивает данные, а ссылается на JSON-эндпоинт"""
+        game_id = add_games(arena_db, [GameStatus.COMPLETED])[0]
+
+        html = client.get(f'/arena/replay/{game_id}').get_data(as_text=True)
+
+        assert f'Бой #{game_id}: Alice vs Bob' in html
+        assert f'const replayDataUrl = "/arena/api/replay/{game_id}"' in html
+        assert 'const gameData' not in html
+
+    def test_replay_data_json(self, arena_db, client):
+        """JSON боя компактный, кешируется и поддерживает условные запросы"""
+        game_id = add_games(arena_db, [GameStatus.COMPLETED])[0]
+
+        response = client.get(f'/arena/api/replay/{game_id}')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert response.headers['Cache-Control'] == 'private, max-age=86400'
+        assert b'"name":"Alice"' in response.data
+        data = response.get_json()
+        assert data['game']['status'] == 'completed'
+        assert data['field']['name'] == '5x5'
+
+        cached = client.get(f'/arena/api/replay/{game_id}', headers={'If-None-Match': response.headers['ETag']})
+        assert cached.status_code == 304
+
+    def test_replay_data_gzip(self, arena_db, client):
+        """Клиент с поддержкой gzip получает сжатые данные боя"""
+        import gzip
+        import json
+
+        game_id = add_games(arena_db, [GameStatus.COMPLETED])[0]
+
+        response = client.get(f'/arena/api/replay/{game_id}', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert response.headers['Content-Length'] == str(len(response.data))
+        assert json.loads(gzip.decompress(response.data))['player2']['name'] == 'Bob'
+
+    def test_completed_replay_built_once(self, arena_db, client):
+        """Данные завершённого боя собираются из БД один раз"""
+        from web.arena import get_game_full_data
+
+        game_id = add_games(arena_db, [GameStatus.COMPLETED])[0]
+
+        with patch('web.arena.get_game_full_data', side_effect=get_game_full_data) as build:
+            first = client.get(f'/arena/api/replay/{game_id}')
+            second = client.get(f'/arena/api/replay/{game_id}', headers={'Accept-Encoding': 'gzip'})
+            client.get(f'/arena/api/replay/{game_id}')
+
+        assert build.call_count == 1
+        assert first.status_code == second.status_code == 200
+        assert first.headers['ETag'] != second.headers['ETag']
+
+    def test_unfinished_game_revalidated(self, arena_db, client):
+        """Данные незавершённой игры браузер перепроверяет при каждом запросе"""
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+
+        response = client.get(f'/arena/api/replay/{game_id}')
+
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+
+    def test_unfinished_replay_not_cached(self, arena_db, client):
+        """Данные незавершённой игры собираются заново при каждом запросе"""
+        from web.arena import get_game_full_data
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+
+        with patch('web.arena.get_game_full_data', side_effect=get_game_full_data) as build:
+            client.get(f'/arena/api/replay/{game_id}')
+            client.get(f'/arena/api/replay/{game_id}')
+
+        assert build.call_count == 2
+
+    def test_missing_game(self, arena_db, client):
+        """Несуществующий бой: 404 и для страницы, и для данных"""
+        assert client.get('/arena/replay/999').status_code == 404
+        assert client.get('/arena/api/replay/999').status_code == 404
+
+
+class TestPlayPage:
+    """Тесты страницы выбора игры"""
+
+    def test_redirects_to_own_active_game(self, arena_db, client):
+        """Пользователь с активной игрой перенаправляется в неё"""
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+
+        response = client.get('/arena/play')
+
+        assert response.status_code == 302
+        assert response.headers['Location'].endswith(f'/arena/play/{game_id}')
+
+    def test_ignores_foreign_active_game(self, arena_db, client):
+        """Чужая активная игра не открывается у пользователя, не участвующего в ней"""
+        add_games(arena_db, [GameStatus.IN_PROGRESS])
+        with arena_db.get_session() as session_db:
+            session_db.add(GameUser(telegram_id=3, username='Carol'))
+            session_db.commit()
+        with client.session_transaction() as sess:
+            sess['username'] = 'Carol'
+
+        with patch.object(arena_db, 'get_available_opponents_by_username', return_value=(None, [])):
+            response = client.get('/arena/play')
+
+        assert response.status_code == 200
+
+    def test_game_page_player_from_loaded_players(self, arena_db, client):
+        """Страница игры определяет сторону пользователя по уже загруженным игрокам"""
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        with client.session_transaction() as sess:
+            sess['username'] = 'Bob'
+
+        with arena_db.get_session() as session_db:
+            bob_id = session_db.query(GameUser.id).filter_by(username='Bob').scalar()
+
+        statements = record_statements(arena_db)
+        html = client.get(f'/arena/play/{game_id}').data.decode('utf-8')
+
+        assert f'const autoLoadPlayerId = {bob_id};' in html
+        assert len(statements) == 1
+
+    def test_current_game_user_cached_per_request(self, arena_db):
+        """GameUser текущего пользователя запрашивается один раз за запрос"""
+        from flask import session
+        from web.arena import current_game_user
+
+        add_games(arena_db, [GameStatus.WAITING])
+        with app.test_request_context('/arena/'), arena_db.get_session() as session_db:
+            session['username'] = 'Alice'
+            first = current_game_user(session_db)
+            statements = record_statements(arena_db)
+            assert current_game_user(session_db) is first
+            assert first.username == 'Alice'
+            assert statements == []
+
+    def test_opponents_cached_until_post(self, arena_db, client):
+        """Подбор противников кешируется и сбрасывается успешным POST арены"""
+        from flask import Response
+        from web.arena import reset_stats_after_change
+
+        with patch.object(arena_db, 'get_available_opponents_by_username', return_value=(None, [])) as pick:
+            client.get('/arena/play')
+            client.get('/arena/play')
+            assert pick.call_count == 1
+
+            with app.test_request_context('/arena/api/games/create', method='POST'):
+                reset_stats_after_change(Response(status=200))
+            client.get('/arena/play')
+
+        assert pick.call_count == 2
+
+
+class TestGamePlayers:
+    """Тесты загрузки игроков вместе с игрой"""
+
+    def test_play_game_shows_player_names(self, arena_db, client):
+        """Страница активной игры выводит имена обоих игроков"""
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+
+        response = client.get(f'/arena/play/{game_id}')
+
+        assert response.status_code == 200
+        html = response.get_data(as_text=True)
+        assert 'Alice' in html
+        assert 'Bob' in html
+
+    def test_notify_opponent_sends_to_other_player(self, arena_db):
+        """Уведомление о ходе уходит противнику походившего игрока"""
+        from web.arena import notify_opponent
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        with arena_db.get_session() as session_db:
+            alice_id = session_db.query(GameUser.id).filter_by(username='Alice').scalar()
+
+        with patch('web.arena.send_telegram_notification_async') as send:
+            notify_opponent(game_id, alice_id, 'ход')
+
+        chat_id, message, _ = send.call_args[0]
+        assert chat_id == 2
+        assert message == '📍 Противник: ход'
+
+    def test_notify_opponent_single_query(self, arena_db):
+        """Для уведомления противника выполняется один запрос"""
+        from web.arena import notify_opponent
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        with arena_db.get_session() as session_db:
+            bob_id = session_db.query(GameUser.id).filter_by(username='Bob').scalar()
+
+        statements = record_statements(arena_db)
+        with patch('web.arena.send_telegram_notification_async') as send:
+            notify_opponent(game_id, bob_id, 'атака', action_type='attack')
+
+        assert len(statements) == 1
+        assert send.call_args[0][:2] == (1, '⚔️ Противник: атака')
+
+    def test_notify_move_turn_switch(self, arena_db):
+        """После смены хода противник получает приглашение сделать ход"""
+        from web.arena import notify_move
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        with arena_db.get_session() as session_db:
+            alice_id = session_db.get(Game, game_id).player1_id
+
+        with patch('web.arena.send_telegram_notification_async') as send:
+            statements = record_statements(arena_db)
+            notify_move(game_id, alice_id, 'ход', 'move', GameStatus.IN_PROGRESS, None, True)
+
+        assert [call[0][0] for call in send.call_args_list] == [1, 2, 2]
+        assert send.call_args[0][1].startswith('🔔 <b>Теперь ваш ход!</b>')
+        assert send.call_args[0][2] == f'{{"inline_keyboard":[[{{"text":"🎮 Ваш ход!","callback_data":"show_game:{game_id}"}}]]}}'
+        # Противник для уведомления о смене хода не запрашивается повторно
+        assert len(statements) == 2
+
+    def test_notify_move_logs_errors(self, arena_db):
+        """Ошибка при отправке уведомлений в фоне логируется, а не теряется"""
+        from web.arena import notify_move
+
+        with patch('web.arena.notify_current_player', side_effect=RuntimeError('boom')), \
+                patch('web.arena.logger') as logger:
+            notify_move(1, 1, 'ход', 'move', GameStatus.IN_PROGRESS, None, False)
+
+        assert 'boom' in logger.error.call_args[0][0]
+
+    def test_game_completion_notifies_both(self, arena_db):
+        """Итог игры получают победитель и проигравший"""
+        from web.arena import notify_game_completion
+
+        game_id = add_games(arena_db, [GameStatus.IN_PROGRESS])[0]
+        with arena_db.get_session() as session_db:
+            bob_id = session_db.query(GameUser.id).filter_by(username='Bob').scalar()
+
+        with patch('web.arena.send_telegram_notification_async') as send:
+            notify_game_completion(game_id, bob_id, 'Бой окончен')
+
+        assert [call[0][0] for call in send.call_args_list] == [2, 1]
+        assert '👑 <b>Победитель:</b> Bob' in send.call_args[0][1]
+        assert '💔 <b>Проигравший:</b> Alice' in send.call_args[0][1]
+
+
+class TestProcessConstants:
+    """Тесты значений, вычисляемых один раз за процесс"""
+
+    def test_bot_token_from_environment(self):
+        """Токен бота берётся из TELEGRAM_BOT_TOKEN без чтения config.json"""
+        from unittest.mock import mock_open
+        from web.arena import _load_telegram_bot_token
+
+        config = mock_open(read_data='{"telegram": {"bot_token": "from-config"}}')
+        with patch.dict('os.environ', {'TELEGRAM_BOT_TOKEN': 'from-env'}), patch('builtins.open', config):
+            assert _load_telegram_bot_token() == 'from-env'
+        assert config.call_count == 0
+
+    def test_bot_token_config_fallback(self):
+        """Без переменной окружения токен читается из config.json"""
+        import os
+        from unittest.mock import mock_open
+        from web.arena import _load_telegram_bot_token
+
+        config = mock_open(read_data='{"telegram": {"bot_token": "from-config"}}')
+        environ = {k: v for k, v in os.environ.items() if k != 'TELEGRAM_BOT_TOKEN'}
+        with patch.dict('os.environ', environ, clear=True), patch('builtins.open', config):
+            assert _load_telegram_bot_token() == 'from-config'
+
+    def test_versions_read_once(self):
+        """Файлы версий читаются один раз за процесс"""
+        from unittest.mock import mock_open
+        from web.templates import get_web_version, get_bot_version
+
+        version_file = mock_open(read_data='1.2.3\n')
+        get_web_version.cache_clear()
+        get_bot_version.cache_clear()
+        try:
+            with patch('builtins.open', version_file):
+                assert [get_web_version() for _ in range(3)] == ['1.2.3'] * 3
+                assert [get_bot_version() for _ in range(3)] == ['1.2.3'] * 3
+        finally:
+            get_web_version.cache_clear()
+            get_bot_version.cache_clear()
+        assert version_file.call_count == 2
+
+    def test_missing_token_skips_send(self):
+        """Без токена уведомление не отправляется"""
+        from web.arena import send_telegram_notification, _telegram_session
+
+        with patch('web.arena.TELEGRAM_BOT_TOKEN', None), patch.object(_telegram_session, 'post') as post:
+            assert send_telegram_notification(42, 'Привет') is False
+        post.assert_not_called()
+
+
+class TestTelegramNotifications:
+    """Тесты фоновой отправки уведомлений"""
+
+    def test_async_send_runs_in_background(self):
+        """Уведомление отправляется в фоновом потоке и не блокирует вызывающего"""
+        import threading
+        from web.arena import send_telegram_notification_async
+
+        threads = []
+
+        def fake_send(chat_id, message, reply_markup):
+            threads.append(threading.current_thread())
+            return True
+
+        with patch('web.arena.send_telegram_notification', side_effect=fake_send):
+            future = send_telegram_notification_async(42, 'Привет')
+            assert future.result(timeout=5) is True
+
+        assert threads[0] is not threading.current_thread()
+        assert threads[0].name.startswith('telegram')
+
+    def test_send_reuses_http_session(self):
+        """Запросы к Telegram API идут через общую HTTP-сессию с пулом соединений"""
+        from unittest.mock import MagicMock
+        from web.arena import send_telegram_notification, _telegram_session
+
+        response = MagicMock(status_code=200)
+        with patch('web.arena.TELEGRAM_BOT_TOKEN', 'token'), \
+                patch.object(_telegram_session, 'post', return_value=response) as post:
+            assert send_telegram_notification(42, 'Привет') is True
+            assert send_telegram_notification(43, 'Привет') is True
+
+        assert post.call_count == 2
+        assert post.call_args.kwargs['timeout'] == (3, 7)
+        assert _telegram_session.get_adapter('https://api.telegram.org').max_retries.total == 2
+
+    def test_reply_markup_compact(self):
+        """Кнопки уведомления кодируются компактно и без экранирования кириллицы"""
+        from unittest.mock import MagicMock
+        from web.arena import send_telegram_notification, _telegram_session
+
+        reply_markup = {'inline_keyboard': [[{'text': '✅ Принять', 'callback_data': 'accept_game:1'}]]}
+        with patch('web.arena.TELEGRAM_BOT_TOKEN', 'token'), \
+                patch.object(_telegram_session, 'post', return_value=MagicMock(status_code=200)) as post:
+            send_telegram_notification(42, 'Привет', reply_markup)
+
+        encoded = post.call_args.kwargs['json']['reply_markup']
+        assert encoded == '{"inline_keyboard":[[{"text":"✅ Принять","callback_data":"accept_game:1"}]]}'
+
+    def test_rate_limited_send_retried(self):
+        """После ответа 429 отправка откладывается на retry_after и повторяется"""
+        from unittest.mock import MagicMock
+        from web.arena import send_telegram_notification, _telegram_session
+
+        limited = MagicMock(status_code=429)
+        limited.json.return_value = {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 5}}
+        ok = MagicMock(status_code=200)
+
+        with patch('web.arena.TELEGRAM_BOT_TOKEN', 'token'), \
+                patch.object(_telegram_session, 'post', side_effect=[limited, ok]) as post, \
+                patch('web.arena.time.sleep') as sleep, \
+                patch('web.arena._telegram_next_send_at', 0.0):
+            assert send_telegram_notification(42, 'Привет') is True
+
+        assert post.call_count == 2
+        assert sleep.call_args[0][0] == pytest.approx(5, abs=0.5)
+
+    def test_rate_limited_gives_up(self):
+        """Если Telegram продолжает отвечать 429, отправка прекращается после лимита попыток"""
+        from unittest.mock import MagicMock
+        from web.arena import send_telegram_notification, _telegram_session, TELEGRAM_MAX_ATTEMPTS
+
+        limited = MagicMock(status_code=429)
+        limited.json.return_value = {'ok': False, 'parameters': {'retry_after': 1}}
+
+        with patch('web.arena.TELEGRAM_BOT_TOKEN', 'token'), \
+                patch.object(_telegram_session, 'post', return_value=limited) as post, \
+                patch('web.arena.time.sleep'), \
+                patch('web.arena._telegram_next_send_at', 0.0):
+            assert send_telegram_notification(42, 'Привет') is False
+
+        assert post.call_count == TELEGRAM_MAX_ATTEMPTS
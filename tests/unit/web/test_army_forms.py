@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Тесты разбора формы характеристик юнита расы
+"""
+
+import pytest
+from werkzeug.datastructures import MultiDict
+from web.army import parse_unit_stats
+
+
+class TestParseUnitStats:
+    """Тесты parse_unit_stats"""
+
+    def test_valid_values(self):
+        """Корректные значения возвращаются как есть"""
+        form = MultiDict({
+            'attack': '15', 'defense': '7', 'min_damage': '2', 'max_damage': '6',
+            'health': '30', 'speed': '5', 'initiative': '12'
+        })
+        assert parse_unit_stats(form) == {
+            'attack': 15, 'defense': 7, 'min_damage': 2, 'max_damage': 6,
+            'health': 30, 'speed': 5, 'initiative': 12
+        }
+
+    def test_defaults_for_missing_fields(self):
+        """Отсутствующие и пустые поля получают значения по умолчанию"""
+        stats = parse_unit_stats(MultiDict({'attack': ''}))
+        assert stats == {
+            'attack': 10, 'defense': 5, 'min_damage': 1, 'max_damage': 3,
+            'health': 10, 'speed': 4, 'initiative': 10
+        }
+
+    def test_values_clamped_to_range(self):
+        """Значения вне диапазона прижимаются к границам"""
+        stats = parse_unit_stats(MultiDict({'attack': '500', 'defense': '-3', 'speed': '0'}))
+        assert stats['attack'] == 100
+        assert stats['defense'] == 0
+        assert stats['speed'] == 1
+
+    def test_invalid_value_raises(self):
+        """Нечисловое значение приводит к ValueError"""
+        with pytest.raises(ValueError):
+            parse_unit_stats(MultiDict({'health': 'много'}))
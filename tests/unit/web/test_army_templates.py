@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Тесты шаблонов раздела армии
+"""
+
+import pytest
+from flask import render_template, stream_template
+from web.app import app
+
+
+ARMY_TEMPLATES = [
+    'army/user_races_list.html',
+    'army/select_race.html',
+    'army/edit_user_race.html',
+    'army/edit_user_race_unit.html',
+]
+
+
+@pytest.fixture
+def client():
+    """Создать тестовый клиент Flask"""
+    app.config['TESTING'] = True
+
+    with app.test_client() as client:
+        yield client
+
+
+class TestArmyTemplates:
+    """Тесты загрузки шаблонов армии"""
+
+    @pytest.mark.parametrize('name', ARMY_TEMPLATES)
+    def test_template_loaded_once(self, name):
+        """Шаблон находится по имени и берётся из кеша при повторной загрузке"""
+        with app.app_context():
+            template = app.jinja_env.get_template(name)
+            assert app.jinja_env.get_template(name) is template
+
+    def test_template_includes_shared_parts(self):
+        """Файловый шаблон подключает общие стили, меню и футер"""
+        with app.test_request_context('/army/races/select'):
+            html = render_template('army/select_race.html', active_page='user_race', races=[])
+        assert 'class="navbar"' in html
+        assert 'Web:' in html
+        assert 'FOOTER_TEMPLATE' not in html
+        assert '/static/css/bundle.css?v=' in html
+        assert '<style>' not in html.split('<nav', 1)[1]
+
+    def test_edit_unit_page_streamed(self):
+        """Страница настройки юнита рендерится потоком по частям"""
+        from types import SimpleNamespace
+
+        level = SimpleNamespace(level=2, icon='🏹')
+        race_unit = SimpleNamespace(id=1, name='Лучник', unit_level=level)
+        skins = [SimpleNamespace(id=5, name='Лесной лучник', description=None)]
+        with app.test_request_context('/army/races/1/unit/1'):
+            stream = stream_template(
+                'army/edit_user_race_unit.html', active_page='user_race', user_race_id=1,
+                race_unit=race_unit, skins=skins, user_unit=None, current_skin_id=None
+            )
+            html = ''.join(stream)
+        assert 'Лесной лучник' in html
+        assert '🏹 Лучник (Ур. 2)' in html
+
+    def test_army_pages_require_login(self, client):
+        """Без авторизации страницы армии перенаправляют на логин"""
+        response = client.get('/army/races')
+        assert response.status_code == 302
+        assert '/login' in response.headers['Location']
+
+    def test_logged_in_session_passes_login_check(self, client):
+        """С cookie авторизованной сессии декоратор пропускает запрос к обработчику"""
+        with client.session_transaction() as sess:
+            sess['username'] = 'tester'
+
+        # Обработчик настроек армии не обращается к БД
+        response = client.get('/army/settings')
+        assert response.status_code == 200
+
+
+    def test_army_settings_template_compiled_once(self, client):
+        """Шаблон настроек армии компилируется один раз"""
+        with client.session_transaction() as sess:
+            sess['username'] = 'tester'
+
+        client.get('/army/settings')
+        template = app.jinja_env.get_template('army/settings.html')
+        response = client.get('/army/settings')
+        assert app.jinja_env.get_template('army/settings.html') is template
+        assert 'Настройка армии' in response.data.decode('utf-8')
+
+    def test_army_settings_page_cached_with_flashes(self, client):
+        """Готовый HTML настроек берётся из кеша, flash-сообщения вставляются в него"""
+        from web.army import _army_settings_pages
+
+        _army_settings_pages.clear()
+        with client.session_transaction() as sess:
+            sess['username'] = 'tester'
+            sess['_flashes'] = [('success', 'Армия сохранена')]
+
+        first = client.get('/army/settings').data.decode('utf-8')
+        second = client.get('/army/settings').data.decode('utf-8')
+
+        assert '<div class="flash success">Армия сохранена</div>' in first
+        assert 'Армия сохранена' not in second
+        assert '<!--flashes-->' not in first
+        assert len(_army_settings_pages) == 1
+
+    def test_army_settings_etag(self, client):
+        """Повторный запрос с тем же ETag получает 304 без тела"""
+        with client.session_transaction() as sess:
+            sess['username'] = 'tester'
+
+        response = client.get('/army/settings')
+        etag = response.headers['ETag']
+        assert response.headers['Content-Length'] == str(len(response.data))
+        assert 'no-cache' in response.headers['Cache-Control']
+        assert 'private' in response.headers['Cache-Control']
+
+        cached = client.get('/army/settings', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+
+        # Страница с flash-сообщением имеет другой ETag и отдаётся целиком
+        with client.session_transaction() as sess:
+            sess['_flashes'] = [('success', 'Армия сохранена')]
+        flashed = client.get('/army/settings', headers={'If-None-Match': etag})
+        assert flashed.status_code == 200
+        assert flashed.headers['ETag'] != etag
+
+class TestRaceCardCache:
+    """Тесты кеша карточек рас"""
+
+    def _race(self, description):
+        from types import SimpleNamespace
+        level = SimpleNamespace(level=1, icon='🗡️')
+        unit = SimpleNamespace(name='Крестьянин', unit_level=level)
+        return SimpleNamespace(id=987654, description=description, race_units=[unit])
+
+    def test_card_cached_until_invalidated(self):
+        """Карточка берётся из кеша, пока её не сбросят"""
+        from web.army import render_race_card, invalidate_race_cards
+
+        invalidate_race_cards()
+        with app.app_context():
+            first = render_race_card(self._race('Старое описание'))
+            assert 'Старое описание' in first
+            assert '🗡️' in first
+
+            # Повторная отрисовка не перестраивает фрагмент
+            assert render_race_card(self._race('Новое описание')) is first
+
+            invalidate_race_cards(987654)
+            assert 'Новое описание' in render_race_card(self._race('Новое описание'))
+        invalidate_race_cards()
+
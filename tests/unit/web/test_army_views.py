@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Тесты обработчиков раздела армии на базе SQLite в памяти
+"""
+
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from db.models import GameUser, GameRace, UserRace, RaceUnit, RaceUnitSkin, UnitLevel
+from db.repository import Database
+from web.app import app
+
+
+@pytest.fixture
+def army_db():
+    """Подменить БД приложения на SQLite в памяти"""
+    db = Database('sqlite:///:memory:')
+    db.create_tables()
+    original = app.extensions['db']
+    app.extensions['db'] = db
+    yield db
+    app.extensions['db'] = original
+    db.engine.dispose()
+
+
+@pytest.fixture
+def client():
+    """Создать тестовый клиент Flask с авторизованной сессией"""
+    app.config['TESTING'] = True
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['username'] = 'owner'
+        yield client
+
+
+def add_user_race(db, telegram_id, username, race_name):
+    """Создать пользователя с расой и вернуть id расы пользователя"""
+    with db.get_session() as session_db:
+        user = GameUser(telegram_id=telegram_id, username=username)
+        race = GameRace(name=race_name)
+        session_db.add_all([user, race])
+        session_db.flush()
+        user_race = UserRace(user_id=user.id, race_id=race.id)
+        session_db.add(user_race)
+        session_db.commit()
+        return user_race.id
+
+
+class TestUserRacesList:
+    """Тесты списка рас пользователя"""
+
+    def test_list_shows_race_names(self, army_db, client):
+        """Название расы берётся из того же запроса, что и список"""
+        add_user_race(army_db, 1001, 'owner', 'Эльфы')
+        add_user_race(army_db, 1002, 'stranger', 'Орки')
+
+        html = client.get('/army/races').get_data(as_text=True)
+
+        assert '<td>Эльфы</td>' in html
+        assert 'Орки' not in html
+        assert '0 / 7' in html
+
+
+class TestSelectRace:
+    """Тесты страницы выбора расы"""
+
+    def test_unit_levels_loaded_with_units(self, army_db, client):
+        """Уровни юнитов для превью приходят в запросе юнитов расы, без запроса на юнит"""
+        with army_db.get_session() as session_db:
+            levels = [UnitLevel(level=level, icon=f'L{level}') for level in range(1, 8)]
+            session_db.add_all(levels + [GameUser(telegram_id=1001, username='owner')])
+            session_db.flush()
+            for name in ('Эльфы', 'Орки'):
+                race = GameRace(name=name)
+                session_db.add(race)
+                session_db.flush()
+                session_db.add_all([
+                    RaceUnit(race_id=race.id, unit_level_id=level.id, name=f'{name} {level.level}')
+                    for level in levels
+                ])
+            session_db.commit()
+
+        statements = []
+        event.listen(army_db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        with patch.dict('web.army._race_card_cache', clear=True):
+            html = client.get('/army/races/select').get_data(as_text=True)
+
+        assert 'title="Эльфы 7 (ур. 7)">L7</span>' in html
+        assert not any(statement.lstrip().startswith('SELECT') and 'FROM unit_levels' in statement
+                       and 'JOIN' not in statement for statement in statements)
+        assert sum('FROM race_units' in statement for statement in statements) == 2
+
+
+class TestCreateUserRace:
+    """Тесты выбора расы"""
+
+    def test_race_chosen_once(self, army_db, client):
+        """Повторный выбор расы не создаёт вторую запись"""
+        with army_db.get_session() as session_db:
+            session_db.add_all([GameUser(telegram_id=1001, username='owner'), GameRace(name='Эльфы')])
+            session_db.commit()
+            race_id = session_db.query(GameRace.id).scalar()
+
+        first = client.post(f'/army/races/create/{race_id}')
+        second = client.post(f'/army/races/create/{race_id}')
+
+        with army_db.get_session() as session_db:
+            user_race_id = session_db.query(UserRace.id).one()[0]
+        assert first.headers['Location'].endswith(f'/army/races/{user_race_id}')
+        assert second.headers['Location'].endswith(f'/army/races/{user_race_id}')
+        with client.session_transaction() as sess:
+            assert ('error', 'Вы уже выбрали эту расу') in sess['_flashes']
+
+
+class TestDeleteUserRace:
+    """Тесты удаления расы пользователя"""
+
+    def test_delete_own_race(self, army_db, client):
+        """Своя раса удаляется одним запросом, в сообщении - её название"""
+        user_race_id = add_user_race(army_db, 1001, 'owner', 'Эльфы')
+
+        response = client.get(f'/army/races/{user_race_id}/delete')
+        assert response.status_code == 302
+
+        with army_db.get_session() as session_db:
+            assert session_db.get(UserRace, user_race_id) is None
+        # Сообщение выводится макросом на странице списка
+        html = client.get('/army/races').get_data(as_text=True)
+        assert '<div class="flash success">Раса &#34;Эльфы&#34; удалена</div>' in html
+
+    def test_foreign_race_not_deleted(self, army_db, client):
+        """Чужая раса не удаляется"""
+        user_race_id = add_user_race(army_db, 1002, 'stranger', 'Орки')
+
+        client.get(f'/army/races/{user_race_id}/delete')
+
+        with army_db.get_session() as session_db:
+            assert session_db.get(UserRace, user_race_id) is not None
+        with client.session_transaction() as sess:
+            assert ('error', 'Раса не найдена') in sess['_flashes']
+
+
+class TestEditUserRaceUnit:
+    """Тесты страницы настройки юнита расы"""
+
+    def test_page_lists_unit_skins(self, army_db, client):
+        """На странице выводятся скины юнита, загруженные вместе с ним"""
+        user_race_id = add_user_race(army_db, 1001, 'owner', 'Эльфы')
+        with army_db.get_session() as session_db:
+            user_race = session_db.get(UserRace, user_race_id)
+            level = UnitLevel(level=1, icon='🏹')
+            session_db.add(level)
+            session_db.flush()
+            race_unit = RaceUnit(race_id=user_race.race_id, unit_level_id=level.id, name='Лучник')
+            race_unit.skins = [
+                RaceUnitSkin(name='Лесной лучник', image_data=b'png'),
+                RaceUnitSkin(name='Горный лучник'),
+            ]
+            session_db.add(race_unit)
+            session_db.commit()
+            race_unit_id = race_unit.id
+
+        response = client.get(f'/army/races/{user_race_id}/unit/{race_unit_id}')
+        html = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert 'Лесной лучник' in html
+        assert 'Горный лучник' in html
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Тесты страницы логина веб-интерфейса
+"""
+
+import pytest
+from web.app import app
+
+
+@pytest.fixture
+def client():
+    """Создать тестовый клиент Flask"""
+    app.config['TESTING'] = True
+
+    with app.test_client() as client:
+        yield client
+
+
+class TestLoginPage:
+    """Тесты страницы логина"""
+
+    def test_login_page_renders(self, client):
+        """Форма логина отображается без авторизации"""
+        response = client.get('/login')
+        assert response.status_code == 200
+        html = response.data.decode('utf-8')
+        assert 'Вход в веб-интерфейс' in html
+        assert 'name="username"' in html
+        assert 'name="password"' in html
+
+    def test_login_page_uses_css_bundle(self, client):
+        """Стили логина подключаются из общего CSS-бандла"""
+        html = client.get('/login').data.decode('utf-8')
+        assert '<style>' not in html
+        assert '/static/css/bundle.css?v=' in html
+        assert 'data-page="login"' in html
+
+    def test_css_bundle_served(self, client):
+        """CSS-бандл отдаётся как статический файл"""
+        response = client.get('/static/css/bundle.css')
+        assert response.status_code == 200
+        assert b'[data-page="login"]' in response.data
+        response.close()
+
+    def test_login_page_preload_header(self, client):
+        """GET логина отдаёт Link-заголовок для предзагрузки CSS"""
+        from web.app import get_static_file_version
+
+        version = get_static_file_version('css/bundle.css')
+        response = client.get('/login')
+        link = response.headers.get('Link')
+        assert link == f'</static/css/bundle.css?v={version}>; rel=preload; as=style; crossorigin=anonymous'
+        # URL в заголовке совпадает со ссылкой в HTML
+        assert f'/static/css/bundle.css?v={version}' in response.data.decode('utf-8')
+
+    def test_login_page_gzip(self, client):
+        """Клиент с поддержкой gzip получает сжатую страницу"""
+        import gzip
+
+        response = client.get('/login', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert 'Вход в веб-интерфейс' in gzip.decompress(response.data).decode('utf-8')
+
+    def test_login_page_deflate_fallback(self, client):
+        """Клиент без gzip, но с deflate получает deflate"""
+        import zlib
+
+        response = client.get('/login', headers={'Accept-Encoding': 'deflate'})
+        assert response.headers['Content-Encoding'] == 'deflate'
+        assert 'Вход в веб-интерфейс' in zlib.decompress(response.data).decode('utf-8')
+
+    def test_login_page_identity(self, client):
+        """Клиент без поддержки сжатия получает обычный HTML"""
+        response = client.get('/login')
+        assert 'Content-Encoding' not in response.headers
+        assert 'Вход в веб-интерфейс' in response.data.decode('utf-8')
+
+    def test_login_info_hint_deferred(self, client):
+        """Подсказка про /password скрыта до события load"""
+        html = client.get('/login').data.decode('utf-8')
+        assert '<div class="info" hidden>' in html
+        assert "addEventListener('load'" in html
+
+    def test_css_bundle_sri(self, client):
+        """Ссылка на CSS-бандл содержит корректный SRI-хеш"""
+        import base64
+        import hashlib
+
+        response = client.get('/static/css/bundle.css')
+        expected = 'sha256-' + base64.b64encode(hashlib.sha256(response.data).digest()).decode()
+        response.close()
+
+        html = client.get('/login').data.decode('utf-8')
+        assert f'integrity="{expected}"' in html
+        assert 'crossorigin="anonymous"' in html
+
+    def test_login_template_cached(self, client):
+        """Шаблон логина загружается по имени и компилируется один раз"""
+        client.get('/login')
+        template = app.jinja_env.get_template('login.html')
+        client.get('/login')
+        assert app.jinja_env.get_template('login.html') is template
+
+    @pytest.mark.parametrize('accept_encoding', ['gzip', 'deflate', ''])
+    def test_login_page_content_length(self, client, accept_encoding):
+        """Ответ логина имеет точный Content-Length и не использует chunked"""
+        response = client.get('/login', headers={'Accept-Encoding': accept_encoding})
+        assert response.headers['Content-Length'] == str(len(response.data))
+        assert 'Transfer-Encoding' not in response.headers
+
+    def test_versioned_static_cached_long(self, client):
+        """Статика с хешем содержимого в URL отдаётся с долгим Cache-Control"""
+        from web.app import get_static_file_version
+
+        response = client.get(f"/static/css/bundle.css?v={get_static_file_version('css/bundle.css')}")
+        cache_control = response.headers['Cache-Control']
+        assert 'max-age=31536000' in cache_control
+        assert 'immutable' in cache_control
+        response.close()
+
+    def test_stale_static_version_not_cached_long(self, client):
+        """Версия в URL, не совпадающая с хешем файла, не кешируется надолго"""
+        response = client.get('/static/css/bundle.css?v=abc')
+        assert 'immutable' not in response.headers.get('Cache-Control', '')
+        response.close()
+
+    def test_static_version_from_file_content(self):
+        """Версия статического файла - хеш его содержимого, а не версии веб-интерфейса"""
+        import hashlib
+        import os
+        from web.app import get_static_file_version, versioned_filter
+
+        with open(os.path.join(app.static_folder, 'css/bundle.css'), 'rb') as f:
+            expected = hashlib.sha256(f.read()).hexdigest()[:8]
+
+        assert get_static_file_version('css/bundle.css') == expected
+        assert versioned_filter('/static/css/bundle.css') == f'/static/css/bundle.css?v={expected}'
+
+    def test_session_cookie_minimal(self, client):
+        """После входа в cookie-сессии только username, и она не переподписывается на каждый запрос"""
+        import hashlib
+        from unittest.mock import patch
+        from db.models import GameUser
+        from db.repository import Database
+
+        db = Database('sqlite:///:memory:')
+        db.create_tables()
+        with db.get_session() as session_db:
+            session_db.add(GameUser(telegram_id=1, username='alice', password_hash=hashlib.sha256(b'secret').hexdigest()))
+            session_db.commit()
+
+        with patch('web.app.db', db):
+            response = client.post('/login', data={'username': 'alice', 'password': 'secret'})
+        db.engine.dispose()
+
+        assert response.status_code == 302
+        assert 'Set-Cookie' in response.headers
+        with client.session_transaction() as sess:
+            assert set(sess.keys()) - {'_flashes'} == {'username'}
+            sess.pop('_flashes', None)
+
+        assert 'Set-Cookie' not in client.get('/login').headers
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Тесты админки рас на базе SQLite в памяти
+"""
+
+import os
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from db.models import GameRace, RaceUnit, RaceUnitSkin, UnitLevel
+from db.repository import Database
+from web.app import app
+
+
+RACES_TEMPLATES = [
+    'races/races_list.html',
+    'races/create_race.html',
+    'races/edit_race.html',
+    'races/edit_unit.html',
+    'races/unit_skins.html',
+    'races/add_skin.html',
+    'races/edit_skin.html',
+    'races/unit_levels_list.html',
+    'races/edit_unit_level.html',
+]
+
+
+@pytest.fixture
+def races_db():
+    """Подменить БД модуля рас на SQLite в памяти"""
+    db = Database('sqlite:///:memory:')
+    db.create_tables()
+    with db.get_session() as session_db:
+        session_db.add_all([UnitLevel(level=level) for level in range(1, 8)])
+        session_db.commit()
+    with patch('web.races.db', db), patch.dict('web.races._unit_levels_cache', clear=True):
+        yield db
+    db.engine.dispose()
+
+
+@pytest.fixture
+def client():
+    """Создать тестовый клиент Flask с авторизованной сессией"""
+    app.config['TESTING'] = True
+
+    with app.test_client() as client:
+        with client.session_transaction() as sess:
+            sess['username'] = 'admin'
+        yield client
+
+
+class TestCreateRace:
+    """Тесты создания расы"""
+
+    def test_race_created_with_seven_units(self, races_db, client):
+        """Новая раса получает 7 юнитов - по одному на каждый уровень"""
+        response = client.post('/admin/races/create', data={'name': 'Гномы', 'description': ''})
+        assert response.status_code == 302
+
+        with races_db.get_session() as session_db:
+            race = session_db.query(GameRace).filter_by(name='Гномы').one()
+            units = session_db.query(RaceUnit).filter_by(race_id=race.id).all()
+            levels = sorted(unit.unit_level.level for unit in units)
+            assert all(unit.created_at is not None for unit in units)
+
+        assert levels == [1, 2, 3, 4, 5, 6, 7]
+
+    def test_unit_levels_read_once(self, races_db, client):
+        """Справочник уровней юнитов читается из БД один раз на несколько рас"""
+        statements = record_statements(races_db)
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+        client.post('/admin/races/create', data={'name': 'Эльфы'})
+
+        assert sum('FROM unit_levels' in statement for statement in statements) == 1
+        with races_db.get_session() as session_db:
+            assert session_db.query(RaceUnit).filter(RaceUnit.unit_level_id.is_(None)).count() == 0
+            assert session_db.query(RaceUnit).count() == 14
+
+
+class TestGetRaceUnit:
+    """Тесты получения юнита расы по первичному ключу"""
+
+    def test_unit_of_other_race_not_found(self, races_db, client):
+        """Юнит чужой расы не открывается по URL другой расы"""
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+        client.post('/admin/races/create', data={'name': 'Эльфы'})
+
+        from web.races import get_race_unit
+        with races_db.get_session() as session_db:
+            dwarves = session_db.query(GameRace).filter_by(name='Гномы').one()
+            elves = session_db.query(GameRace).filter_by(name='Эльфы').one()
+            elves_id = elves.id
+            unit_id = dwarves.race_units[0].id
+
+            race, unit = get_race_unit(session_db, dwarves.id, unit_id)
+            assert race is dwarves
+            assert unit.id == unit_id
+            assert get_race_unit(session_db, elves.id, unit_id) == (None, None)
+
+        response = client.get(f'/admin/races/{elves_id}/unit/{unit_id}/edit')
+        assert response.status_code == 302
+
+
+def record_statements(db):
+    """Начать запись SQL-запросов к БД, вернуть список выполненных запросов"""
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    return statements
+
+
+class TestRacesQueries:
+    """Тесты числа SQL-запросов страниц админки рас"""
+
+    def test_races_list_query_count_independent_of_races(self, races_db, client):
+        """Список рас загружает юниты одним запросом для всех рас"""
+        for name in ('Гномы', 'Эльфы', 'Орки'):
+            client.post('/admin/races/create', data={'name': name})
+
+        statements = record_statements(races_db)
+        html = client.get('/admin/races/').data.decode('utf-8')
+
+        assert html.count('7/7 юнитов') == 3
+        assert len(statements) == 2
+        assert 'race_units.name' not in statements[1]
+
+    def test_edit_race_query_count_independent_of_units(self, races_db, client):
+        """Страница расы загружает уровни и скины юнитов без запроса на каждый юнит"""
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+        with races_db.get_session() as session_db:
+            race = session_db.query(GameRace).filter_by(name='Гномы').one()
+            race_id = race.id
+            for unit in race.race_units:
+                session_db.add(RaceUnitSkin(race_unit_id=unit.id, name='Скин', image_data=b'png'))
+            session_db.commit()
+
+        statements = record_statements(races_db)
+        html = client.get(f'/admin/races/{race_id}/edit').data.decode('utf-8')
+
+        assert html.count('Скинов: 1') == 7
+        assert len(statements) == 3
+        assert not any('image_data' in statement for statement in statements)
+        assert not any('race_unit_skins.name' in statement for statement in statements)
+
+
+    def test_unit_skins_list_skips_image_blob(self, races_db, client):
+        """Список скинов не читает BLOB изображения, а только признак его наличия"""
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+        with races_db.get_session() as session_db:
+            unit = session_db.query(RaceUnit).first()
+            race_id, unit_id = unit.race_id, unit.id
+            session_db.add_all([
+                RaceUnitSkin(race_unit_id=unit_id, name='С картинкой', image_data=b'png', image_mime_type='image/png'),
+                RaceUnitSkin(race_unit_id=unit_id, name='Без картинки'),
+            ])
+            session_db.commit()
+
+        statements = record_statements(races_db)
+        html = client.get(f'/admin/races/{race_id}/unit/{unit_id}/skins').data.decode('utf-8')
+
+        assert html.count('/image" alt="Скин"') == 1
+        assert html.count('Нет изображения') == 1
+        skins_statement = next(statement for statement in statements if 'FROM race_unit_skins' in statement)
+        assert skins_statement.count('image_data') == 1
+        assert 'image_data IS NOT NULL' in skins_statement
+
+
+class TestSkinImage:
+    """Тесты отдачи изображения скина"""
+
+    def add_skin(self, races_db, client, **fields):
+        """Создать расу и скин её первого юнита, вернуть id скина"""
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+        with races_db.get_session() as session_db:
+            unit = session_db.query(RaceUnit).first()
+            skin = RaceUnitSkin(race_unit_id=unit.id, name='Скин', **fields)
+            session_db.add(skin)
+            session_db.commit()
+            return skin.id
+
+    def test_image_served_by_column_select(self, races_db, client):
+        """Картинка отдаётся запросом только нужных колонок"""
+        skin_id = self.add_skin(races_db, client, image_data=b'jpeg-bytes', image_mime_type='image/jpeg')
+
+        statements = record_statements(races_db)
+        response = client.get(f'/admin/races/skin/{skin_id}/image')
+
+        assert response.status_code == 200
+        assert response.data == b'jpeg-bytes'
+        assert response.mimetype == 'image/jpeg'
+        assert not any('race_unit_skins.name' in statement for statement in statements)
+
+    def test_not_modified_without_reading_image(self, races_db, client):
+        """Повторный запрос с ETag получает 304, картинка из БД не читается"""
+        skin_id = self.add_skin(races_db, client, image_data=b'jpeg-bytes', image_mime_type='image/jpeg')
+        response = client.get(f'/admin/races/skin/{skin_id}/image')
+        etag = response.headers['ETag']
+        assert 'max-age=3600' in response.headers['Cache-Control']
+
+        statements = record_statements(races_db)
+        response = client.get(f'/admin/races/skin/{skin_id}/image', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert len(statements) == 1
+        assert 'image_data IS NOT NULL' in statements[0]
+
+    def test_etag_changes_after_skin_update(self, races_db, client):
+        """После замены картинки ETag меняется и браузер получает новую картинку"""
+        skin_id = self.add_skin(races_db, client, image_data=b'old', image_mime_type='image/png')
+        etag = client.get(f'/admin/races/skin/{skin_id}/image').headers['ETag']
+
+        with races_db.get_session() as session_db:
+            session_db.get(RaceUnitSkin, skin_id).image_data = b'new'
+            session_db.commit()
+
+        response = client.get(f'/admin/races/skin/{skin_id}/image', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.data == b'new'
+        assert response.headers['ETag'] != etag
+
+    def test_missing_image(self, races_db, client):
+        """Для скина без картинки и несуществующего скина отдаётся пустой PNG с 404"""
+        skin_id = self.add_skin(races_db, client)
+
+        for url in (f'/admin/races/skin/{skin_id}/image', '/admin/races/skin/999/image'):
+            response = client.get(url)
+            assert response.status_code == 404
+            assert response.mimetype == 'image/png'
+
+
+class TestSkinLookup:
+    """Тесты получения скинов и уровней по первичному ключу"""
+
+    def test_skin_of_other_unit_not_editable(self, races_db, client):
+        """Скин чужого юнита не открывается по URL другого юнита"""
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+        with races_db.get_session() as session_db:
+            first, second = session_db.query(RaceUnit).order_by(RaceUnit.id).limit(2).all()
+            race_id, first_id, second_id = first.race_id, first.id, second.id
+            skin = RaceUnitSkin(race_unit_id=first_id, name='Скин')
+            session_db.add(skin)
+            session_db.commit()
+            skin_id = skin.id
+
+        assert client.get(f'/admin/races/{race_id}/unit/{first_id}/skin/{skin_id}/edit').status_code == 200
+        response = client.get(f'/admin/races/{race_id}/unit/{second_id}/skin/{skin_id}/edit')
+        assert response.status_code == 302
+
+    def test_delete_skin(self, races_db, client):
+        """Скин удаляется по id, повторное удаление сообщает об ошибке"""
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+        with races_db.get_session() as session_db:
+            skin = RaceUnitSkin(race_unit_id=session_db.query(RaceUnit.id).first()[0], name='Скин')
+            session_db.add(skin)
+            session_db.commit()
+            skin_id = skin.id
+
+        assert client.post(f'/admin/races/skin/{skin_id}/delete').get_json() == {'success': True}
+        assert client.post(f'/admin/races/skin/{skin_id}/delete').get_json()['success'] is False
+
+    def test_edit_unit_level(self, races_db, client):
+        """Уровень юнита открывается по id, неизвестный id возвращает к списку"""
+        with races_db.get_session() as session_db:
+            level_id = session_db.query(UnitLevel.id).filter_by(level=3).scalar()
+
+        response = client.get(f'/admin/races/unit-levels/{level_id}/edit')
+        assert response.status_code == 200
+        assert 'Редактировать уровень 3' in response.data.decode('utf-8')
+        assert client.get('/admin/races/unit-levels/999/edit').status_code == 302
+
+
+class TestRacesTemplates:
+    """Тесты загрузки шаблонов админки рас"""
+
+    @pytest.mark.parametrize('name', RACES_TEMPLATES)
+    def test_template_loaded_once(self, name):
+        """Шаблон находится по имени и берётся из кеша при повторной загрузке"""
+        template = app.jinja_env.get_template(name)
+        assert app.jinja_env.get_template(name) is template
+
+    def test_races_list_rendered_from_cached_template(self, races_db, client):
+        """Список рас рендерится из скомпилированного шаблона без from_string"""
+        client.post('/admin/races/create', data={'name': 'Гномы'})
+
+        with patch.object(app.jinja_env, 'from_string') as from_string:
+            html = client.get('/admin/races/').data.decode('utf-8')
+
+        from_string.assert_not_called()
+        assert 'Гномы' in html
+        assert '7/7 юнитов' in html
+        assert 'class="navbar"' in html
+
+    def test_races_templates_in_bytecode_cache(self):
+        """Байткод шаблонов рас сохраняется в кеш байткода окружения"""
+        cache = app.jinja_env.bytecode_cache
+        template = app.jinja_env.get_template('races/races_list.html')
+        source, filename, _ = app.jinja_env.loader.get_source(app.jinja_env, 'races/races_list.html')
+        bucket = cache.get_bucket(app.jinja_env, 'races/races_list.html', filename, source)
+
+        assert bucket.code is not None
+        assert template.filename == filename
+
+    def test_races_templates_are_files(self):
+        """Шаблоны рас лежат файлами в web/templates/races, а не строками в модуле"""
+        import web.races
+
+        templates_dir = os.path.join(app.root_path, 'templates', 'races')
+        for name in RACES_TEMPLATES:
+            assert os.path.isfile(os.path.join(templates_dir, name.split('/', 1)[1]))
+        assert not any(attr.endswith('_TEMPLATE') for attr in vars(web.races))
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Тесты кешированного построения URL
+"""
+
+from flask import url_for
+from web.app import app
+from web.urls import cached_url_for, _build_url
+
+
+class TestCachedUrlFor:
+    """Тесты cached_url_for"""
+
+    def test_same_result_as_url_for(self):
+        """Кешированный URL совпадает с обычным url_for"""
+        with app.test_request_context('/'):
+            assert cached_url_for('army.edit_user_race', user_race_id=5) == url_for('army.edit_user_race', user_race_id=5)
+            assert cached_url_for('army.edit_user_race', user_race_id=6) == '/army/races/6'
+
+    def test_repeated_calls_hit_cache(self):
+        """Повторный вызов с теми же аргументами берётся из кеша"""
+        _build_url.cache_clear()
+        with app.test_request_context('/'):
+            cached_url_for('army.user_races_list')
+            cached_url_for('army.user_races_list')
+        info = _build_url.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+
+    def test_script_root_in_cache_key(self):
+        """URL под другим корнем приложения не берётся из чужого кеша"""
+        with app.test_request_context('/'):
+            plain = cached_url_for('army.user_races_list')
+        with app.test_request_context('/', base_url='http://localhost/prefix/'):
+            prefixed = cached_url_for('army.user_races_list')
+        assert plain == '/army/races'
+        assert prefixed == '/prefix/army/races'
+
+    def test_templates_use_cached_url_for(self):
+        """В шаблонах url_for подменён на кешированную версию"""
+        assert app.jinja_env.globals['url_for'] is cached_url_for
@@ -635,91 +635,9 @@ LOGIN_TEMPLATE = """
 <html>
 <head>
     <title>Вход в веб-интерфейс</title>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            background-color: #f5f5f5;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            min-height: 100vh;
-            margin: 0;
-        }
-        .login-container {
-            background: white;
-            padding: 40px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            width: 100%;
-            max-width: 400px;
-        }
-        h1 {
-            color: #2c3e50;
-            text-align: center;
-            margin-bottom: 30px;
-        }
-        .form-group {
-            margin-bottom: 20px;
-        }
-        label {
-            display: block;
-            margin-bottom: 5px;
-            color: #555;
-            font-weight: bold;
-        }
-        input[type="text"],
-        input[type="password"] {
-            width: 100%;
-            padding: 10px;
-            border: 1px solid #ddd;
-            border-radius: 4px;
-            font-size: 14px;
-            box-sizing: border-box;
-        }
-        input[type="text"]:focus,
-        input[type="password"]:focus {
-            outline: none;
-            border-color: #3498db;
-        }
-        button {
-            width: 100%;
-            padding: 12px;
-            background-color: #3498db;
-            color: white;
-            border: none;
-            border-radius: 4px;
-            font-size: 16px;
-            cursor: pointer;
-            font-weight: bold;
-        }
-        button:hover {
-            background-color: #2980b9;
-        }
-        .flash-messages {
-            margin-bottom: 20px;
-        }
-        .flash {
-            padding: 10px;
-            border-radius: 4px;
-            margin-bottom: 10px;
-        }
-        .flash.error {
-            background-color: #e74c3c;
-            color: white;
-        }
-        .flash.success {
-            background-color: #2ecc71;
-            color: white;
-        }
-        .info {
-            text-align: center;
-            margin-top: 20px;
-            color: #7f8c8d;
-            font-size: 14px;
-        }
-    </style>
+    <link rel="stylesheet" href="{{ versioned_static('css/bundle.css') }}" integrity="{{ css_sri }}" crossorigin="anonymous">
 </head>
-<body>
+<body data-page="login">
     <div class="login-container">
         <h1>🔐 Вход в веб-интерфейс</h1>
 
@@ -747,10 +665,14 @@ LOGIN_TEMPLATE = """
             <button type="submit">Войти</button>
         </form>
 
-        <div class="info">
+        <div class="info" hidden>
             Установите пароль через команду /password в боте
         </div>
     </div>
+    <script>
+        // Подсказка не нужна для первой отрисовки формы - показываем после загрузки
+        window.addEventListener('load', () => document.querySelector('.info').hidden = false);
+    </script>
 </body>
 </html>
 """
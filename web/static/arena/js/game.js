@@ -21,7 +21,12 @@ let battleScene;
 
 // Инициализация после загрузки DOM
 document.addEventListener('DOMContentLoaded', () => {
-    if (typeof gameData !== 'undefined') {
+    if (typeof replayDataUrl !== 'undefined') {
+        fetch(replayDataUrl, { credentials: 'same-origin' })
+            .then(response => response.json())
+            .then(data => initReplayGame(data))
+            .catch(error => console.error('Не удалось загрузить данные боя:', error));
+    } else if (typeof gameData !== 'undefined') {
         initReplayGame(gameData);
     }
 });
@@ -5,8 +5,12 @@
 
 import os
 from datetime import datetime
+from functools import lru_cache
 
 
+# Файлы версий меняются только с деплоем, а версии выводятся на каждой
+# странице - файл читается один раз за процесс
+@lru_cache(maxsize=1)
 def get_web_version():
     """Получить версию веб-интерфейса из файла WEB_VERSION"""
     try:
@@ -16,6 +20,7 @@ def get_web_version():
         return "unknown"
 
 
+@lru_cache(maxsize=1)
 def get_bot_version():
     """Получить версию бота из файла VERSION"""
     try:
@@ -485,3 +490,11 @@ FOOTER_TEMPLATE = """
     </div>
 </div>
 """
+
+
+# Общие части страниц для файловых шаблонов ({% include '_header.html' %} и т.д.)
+SHARED_TEMPLATES = {
+    '_base_style.html': BASE_STYLE,
+    '_header.html': HEADER_TEMPLATE,
+    '_footer.html': FOOTER_TEMPLATE,
+}
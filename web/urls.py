@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Кеширование построения URL для веб-интерфейса
+"""
+
+from functools import lru_cache
+from flask import has_request_context, request, url_for
+
+
+@lru_cache(maxsize=4096)
+def _build_url(script_root, host_url, blueprint, endpoint, items):
+    """Построить URL (результат зависит только от аргументов ключа кеша)"""
+    return url_for(endpoint, **dict(items))
+
+
+def cached_url_for(endpoint, **values):
+    """url_for с кешированием результата.
+
+    Ключ кеша включает корень приложения и хост запроса, а для относительных
+    эндпоинтов ('.name') - текущий blueprint, поэтому закешированный URL
+    совпадает с тем, что построил бы url_for.
+    """
+    if not has_request_context():
+        return url_for(endpoint, **values)
+
+    try:
+        items = tuple(sorted(values.items()))
+        hash(items)
+    except TypeError:
+        # Нехешируемые аргументы (списки и т.п.) строим без кеша
+        return url_for(endpoint, **values)
+
+    blueprint = request.blueprint if endpoint.startswith('.') else None
+    return _build_url(request.script_root, request.host_url, blueprint, endpoint, items)